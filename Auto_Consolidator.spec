@@ -10,29 +10,49 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # Nothing below is used at runtime; keep it out of the bundle
+    excludes=[
+        'pandas',
+        'numpy',
+        'scipy',
+        'sqlalchemy',
+        'matplotlib',
+        'IPython',
+        'tkinter.test',
+        'test',
+        'unittest',
+        'pydoc',
+        'doctest',
+    ],
     noarchive=False,
-    optimize=0,
+    optimize=2,
 )
 pyz = PYZ(a.pure)
 
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='Auto_Consolidator',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
     upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
     console=False,
     disable_windowed_traceback=False,
     argv_emulation=False,    target_arch=None,
     codesign_identity=None,
     entitlements_file=None,
     icon='auto_consolidator.ico',  # Custom icon for executable and taskbar
+)
+# One-folder layout: nothing is unpacked to a temp directory on each launch
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=True,
+    upx_exclude=[],
+    name='Auto_Consolidator',
 )
\ No newline at end of file
@@ -1,24 +1,37 @@
 import os
+import re
+import json
+import hashlib
 import sys
-import traceback
-from openpyxl import load_workbook, Workbook
+import zipfile
+from operator import itemgetter
+import xml.etree.ElementTree as ET
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk, scrolledtext, font as tkFont
 from datetime import datetime
 from pathlib import Path
 import logging
 import threading
-from ttkthemes import ThemedTk
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from contextlib import contextmanager
 from typing import Optional, List, Callable, Union
 
 # --- Lightweight DataFrame Replacement ---
+def is_empty_value(value) -> bool:
+    """Return True for None or blank strings"""
+    return value is None or (isinstance(value, str) and value.strip() == "")
+
 class CellMapData:
     """
     Lightweight replacement for pandas DataFrame specifically for Cell Map data.
     Provides the minimal interface needed by the consolidator application.
     Uses only built-in Python types and openpyxl for maximum efficiency.
+    
+    Data is stored column-wise (one list per column) so column access is a
+    single reference and bulk checks run over contiguous lists.
     """
     
     def __init__(self, data: List[List], columns: List[str]):
@@ -34,9 +47,26 @@ class CellMapData:
         if data and len(data[0]) != len(columns):
             raise ValueError("Number of columns must match data width")
             
-        self._data = data
         self._columns = columns
-        self._column_indices = {col: idx for idx, col in enumerate(columns)}
+        self._columns_data = {col: [row[idx] for row in data] for idx, col in enumerate(columns)}
+        self._length = len(data)
+    
+    @classmethod
+    def from_columns(cls, columns_data: dict, columns: List[str]) -> "CellMapData":
+        """
+        Build an instance directly from per-column lists without transposing rows.
+        
+        Args:
+            columns_data: Mapping of column name to list of values
+            columns: List of column names (defines column order)
+        """
+        lengths = {len(columns_data[col]) for col in columns}
+        if len(lengths) > 1:
+            raise ValueError("All columns must have the same length")
+        instance = cls([], columns)
+        instance._columns_data = {col: columns_data[col] for col in columns}
+        instance._length = lengths.pop() if lengths else 0
+        return instance
     
     @property
     def columns(self) -> List[str]:
@@ -45,151 +75,75 @@ class CellMapData:
     
     def __len__(self) -> int:
         """Return number of rows"""
-        return len(self._data)
+        return self._length
     
     def __getitem__(self, column_name: str) -> List:
-        """Get column data by name"""
-        if column_name not in self._column_indices:
+        """Get column data by name (returned directly, do not mutate)"""
+        if column_name not in self._columns_data:
             raise KeyError(f"Column '{column_name}' not found")
-        col_idx = self._column_indices[column_name]
-        return [row[col_idx] for row in self._data]
-    
-    def iterrows(self):
-        """
-        Iterate over rows, yielding (index, row_data) tuples.
-        row_data is a dict-like object that supports column access.
-        """
-        for idx, row in enumerate(self._data):
-            row_dict = CellMapRow(dict(zip(self._columns, row)))
-            yield idx, row_dict
-    
-    def isnull(self):
-        """Return a CellMapData with boolean values indicating null/empty values"""
-        null_data = []
-        for row in self._data:
-            null_row = [val is None or (isinstance(val, str) and val.strip() == "") for val in row]
-            null_data.append(null_row)
-        return CellMapData(null_data, self._columns)
-    
-    def duplicated(self, subset: Optional[List[str]] = None):
-        """Return a CellMapData with boolean values indicating duplicate rows"""
-        if subset is None:
-            subset = self._columns
-        
-        # Get indices for subset columns
-        subset_indices = [self._column_indices[col] for col in subset if col in self._column_indices]
-        
-        seen_rows = set()
-        duplicate_flags = []
-        
-        for row in self._data:
-            # Create tuple of subset values for comparison
-            subset_tuple = tuple(row[idx] for idx in subset_indices)
-            is_duplicate = subset_tuple in seen_rows
-            duplicate_flags.append([is_duplicate])  # Single column result
-            seen_rows.add(subset_tuple)
-        
-        return CellMapData(duplicate_flags, ["is_duplicate"])
+        return self._columns_data[column_name]
 
-class CellMapRow:
-    """
-    Dictionary-like object to represent a row from CellMapData.
-    Supports both dict-style and attribute-style access.
+def iter_normalized_rows(ws):
     """
+    Stream a worksheet row by row, yielding the header followed by data rows.
     
-    def __init__(self, data: dict):
-        self._data = data
-    
-    def __getitem__(self, key: str):
-        """Dictionary-style access: row["column_name"]"""
-        return self._data[key]
-    
-    def __contains__(self, key: str) -> bool:
-        """Support 'in' operator"""
-        return key in self._data
-    
-    def get(self, key: str, default=None):
-        """Dict-style get method"""
-        return self._data.get(key, default)
-
-def read_excel_to_cellmapdata(file_path: str, sheet_name: Optional[str] = None) -> CellMapData:
-    """
-    Read an Excel file using openpyxl and return a CellMapData instance.
+    The first non-empty row is yielded as the list of column names. Each
+    following non-empty row is yielded as a list with strings stripped, None
+    replaced by empty strings and its length matched to the header.
     
     Args:
-        file_path: Path to the Excel file
-        sheet_name: Name of the sheet to read (if None, uses active sheet)
-    
-    Returns:
-        CellMapData instance containing the Excel data
-    
-    Raises:
-        ValueError: If the file cannot be read or has no data
+        ws: openpyxl worksheet (read-only worksheets are supported)
     """
-    try:
-        # Open the workbook
-        wb = load_workbook(file_path, read_only=True, data_only=True)
-          # Select the worksheet
-        if sheet_name:
-            if sheet_name not in wb.sheetnames:
-                raise ValueError(f"Sheet '{sheet_name}' not found in workbook")
-            ws = wb[sheet_name]
-        else:
-            ws = wb.active
-        
-        # Ensure we have a valid worksheet
-        if ws is None:
-            raise ValueError("No active worksheet found in workbook")
-        
-        # Read all data from the worksheet
-        data = []
-        columns = []
-        
-        # Get the data range (skip empty rows/columns)
-        if ws.max_row == 1 and ws.max_column == 1:
-            # Check if the single cell is empty
-            cell_value = ws.cell(1, 1).value
-            if cell_value is None or str(cell_value).strip() == "":
-                raise ValueError("Excel sheet appears to be empty")
+    columns = None
+    columns_len = 0
+    # Local aliases keep attribute lookups out of the per-cell loop
+    intern = sys.intern
+    max_interned_length = Constants.MAX_INTERNED_STRING_LENGTH
+    
+    for row in ws.iter_rows(values_only=True):
+        # Skip completely empty rows (only strings can be blank once converted)
+        if not any(cell is not None and (not isinstance(cell, str) or cell.strip()) for cell in row):
+            continue
+            
+        if columns is None:
+            # First non-empty row becomes the header
+            columns = [str(cell).strip() if cell is not None else f"Column_{i}" 
+                      for i, cell in enumerate(row)]
+            columns_len = len(columns)
+            yield columns
+            continue
         
-        # Read header row (first row)
-        first_row = True
-        for row in ws.iter_rows(values_only=True):
-            # Skip completely empty rows
-            if not any(cell is not None and str(cell).strip() for cell in row):
-                continue
-                
-            if first_row:
-                # First non-empty row becomes the header
-                columns = [str(cell).strip() if cell is not None else f"Column_{i}" 
-                          for i, cell in enumerate(row)]
-                first_row = False
+        # Convert None values to empty strings and ensure consistent row length
+        row_data = []
+        append = row_data.append
+        for cell in row[:columns_len]:  # Don't exceed column count
+            if cell is None:
+                append("")
+            elif isinstance(cell, str):
+                # Sheet names and cell refs repeat heavily; share one string object per value
+                cell = cell.strip()
+                append(intern(cell) if len(cell) < max_interned_length else cell)
             else:
-                # Convert None values to empty strings and ensure consistent row length
-                row_data = []
-                for i, cell in enumerate(row):
-                    if i >= len(columns):
-                        break  # Don't exceed column count
-                    if cell is None:
-                        row_data.append("")
-                    else:
-                        row_data.append(str(cell).strip() if isinstance(cell, str) else cell)
-                
-                # Pad row to match column count if necessary
-                while len(row_data) < len(columns):
-                    row_data.append("")
-                
-                data.append(row_data)
-        
-        wb.close()
-        
-        if not columns:
-            raise ValueError("No valid header row found in Excel file")
+                append(cell)
         
-        return CellMapData(data, columns)
+        # Pad row to match column count if necessary
+        if len(row_data) < columns_len:
+            row_data += [""] * (columns_len - len(row_data))
         
-    except Exception as e:
-        raise ValueError(f"Failed to read Excel file '{file_path}': {str(e)}")
+        yield row_data
+
+def reset_unsized_dimensions(ws):
+    """
+    Drop a missing or A1:A1 dimension from a read-only worksheet.
+    
+    Some applications write a bogus A1:A1 dimension, which makes read-only
+    iteration stop after the first cell. Without dimensions openpyxl reads
+    every row and cell present in the sheet. Normal worksheets are returned
+    unchanged.
+    """
+    if hasattr(ws, "reset_dimensions") and ws.max_row in (None, 1) and ws.max_column in (None, 1):
+        ws.reset_dimensions()
+    return ws
 
 # --- Configuration and Setup ---
 @dataclass
@@ -209,17 +163,29 @@ class Constants:
     DEFAULT_HEADER_ROW = 4
     DEFAULT_DATA_START_ROW = 5
     CELL_MAP_FILENAME = "Cell Map.xlsx"
-    MAX_EMPTY_ROWS_BEFORE_STOP = 20
     MAX_FILE_SIZE_MB = 50
     PROGRESS_UPDATE_INTERVAL = 100
+    PROGRESS_MIN_INTERVAL_S = 0.05
     MIN_ROW_NUMBER = 1
     MAX_ROW_NUMBER = 1000
     LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+    MAX_VALIDATION_WORKERS = 8
+    MAX_INTERNED_STRING_LENGTH = 64
+    CACHE_DIR_NAME = "auto_consolidator"
+    CELL_MAP_CACHE_VERSION = 1  # Bump when Cell Map normalization or validation rules change
+    LOG_PUMP_INTERVAL_MS = 50
+    LOG_PUMP_BATCH_SIZE = 200
+    MAX_LOG_LINES = 2000
+    # Value-only reads: stream rows, return cached formula results, skip link and VBA parts
+    READ_WORKBOOK_OPTIONS = {"read_only": True, "data_only": True, "keep_links": False, "keep_vba": False}
 
 # Context manager for safe workbook handling
 @contextmanager
 def open_workbook(file_path, **kwargs):
     """Context manager for safe workbook operations"""
+    # Imported on first use so the window can come up before openpyxl loads
+    from openpyxl import load_workbook
+    
     wb = None
     try:
         wb = load_workbook(file_path, **kwargs)
@@ -235,7 +201,8 @@ LOG_FILE = "consolidator_errors.log"
 logging.basicConfig(
     filename=LOG_FILE,
     level=logging.ERROR,
-    format="%(asctime)s - %(levelname)s - %(message)s\n%(traceback)s\n",
+    # Tracebacks are appended by the logging module when exc_info=True is passed
+    format="%(asctime)s - %(levelname)s - %(message)s",
 )
 
 # --- Core Business Logic ---
@@ -244,6 +211,9 @@ class ExcelConsolidator:
         self.config = config
         self.logger = logger or logging.getLogger(__name__)
         self.cell_map_df = None
+        self._mapping_plan = None  # (source sheet, source cell, destination column) tuples
+        self._required_sheets = None  # Distinct source sheets, in Cell Map order
+        self._col_indices = None  # Header name -> 1-based column index in the consolidation sheet
           # Validate and resolve file paths
         self.cell_map_path = self._resolve_file_path(config.cell_map_path, "Cell Map")
         self.consolidation_path = self._resolve_file_path(config.consolidation_path, "Consolidation")
@@ -278,28 +248,74 @@ class ExcelConsolidator:
             "Destination Column (Consolidation)",
         ]
 
+        # An unchanged Cell Map that already passed validation is loaded from cache
+        cached = CellMapCache.load(self.cell_map_path, required_columns)
+        if cached is not None:
+            columns, column_lists = cached
+            self.logger.info("Cell Map loaded from cache")
+        else:
+            # Single streaming pass: header lookup, null check, duplicate check and
+            # column collection all happen while the rows are read
+            try:
+                with open_workbook(self.cell_map_path, **Constants.READ_WORKBOOK_OPTIONS) as wb:
+                    ws = wb.active
+                    if ws is None:
+                        raise ValueError("Failed to read Cell Map file: No active worksheet found in workbook")
+                
+                    rows = iter_normalized_rows(reset_unsized_dimensions(ws))
+                    columns = next(rows, None)
+                    if not columns:
+                        raise ValueError("Failed to read Cell Map file: No valid header row found in Excel file")
+                
+                    missing_cols = [col for col in required_columns if col not in columns]
+                    if missing_cols:
+                        raise ValueError(f"Cell Map is missing required columns: {', '.join(missing_cols)}")
+                
+                    # itemgetter builds the (sheet, cell, destination) key tuple in C
+                    get_key = itemgetter(*(columns.index(col) for col in required_columns))
+                    column_lists = [[] for _ in columns]
+                    seen_keys = set()
+                
+                    for row_data in rows:
+                        if any(is_empty_value(val) for val in row_data):
+                            raise ValueError("Cell Map contains empty cells. Please fill all values.")
+                    
+                        key = get_key(row_data)
+                        if key in seen_keys:
+                            raise ValueError("Cell Map contains duplicate mappings. Please remove them.")
+                        seen_keys.add(key)
+                    
+                        for column_list, val in zip(column_lists, row_data):
+                            column_list.append(val)
+            except ValueError:
+                raise
+            except Exception as e:
+                raise ValueError(f"Failed to read Cell Map file: {e}")
+        
+        df = CellMapData.from_columns(dict(zip(columns, column_lists)), columns)
+        # Validate and normalize the mappings once; every later phase iterates this plan
         try:
-            df = read_excel_to_cellmapdata(str(self.cell_map_path))
-        except Exception as e:
-            raise ValueError(f"Failed to read Cell Map file: {e}")
-
-        missing_cols = [col for col in required_columns if col not in df.columns]
-        if missing_cols:
-            raise ValueError(f"Cell Map is missing required columns: {', '.join(missing_cols)}")
-
-        # Check for null/empty values using our CellMapData interface
-        null_check = df.isnull()
-        has_nulls = any(any(row) for row in null_check._data)
-        if has_nulls:
-            raise ValueError("Cell Map contains empty cells. Please fill all values.")
+            plan = tuple(
+                (ValidationUtils.validate_sheet_name(str(sheet)), str(cell).strip(), str(dest).strip())
+                for sheet, cell, dest in zip(df["Source Sheet"], df["Source Cell"], df["Destination Column (Consolidation)"])
+            )
+        except ValueError as e:
+            raise ValueError(f"Cell Map contains an invalid source sheet name: {e}")
         
-        # Check for duplicates using our CellMapData interface
-        dup_check = df.duplicated(subset=required_columns)
-        has_duplicates = any(row[0] for row in dup_check._data)
-        if has_duplicates:
-            raise ValueError("Cell Map contains duplicate mappings. Please remove them.")
-
+        # Cell references and required sheets are the same for every estimate file
+        for _, cell_ref, _ in plan:
+            try:
+                ValidationUtils.validate_cell_reference(cell_ref)
+            except ValueError as e:
+                raise ValueError(f"Cell Map contains an invalid source cell: {e}")
+        
+        # Only publish the results once every check has passed; the "validated first"
+        # guards elsewhere test cell_map_df alone
         self.cell_map_df = df
+        self._mapping_plan = plan
+        self._required_sheets = tuple(dict.fromkeys(sheet for sheet, _, _ in plan))
+        if cached is None:
+            CellMapCache.store(self.cell_map_path, columns, column_lists)
         self.logger.info(f"Cell Map validated successfully: {len(df)} mappings loaded")
         return True
 
@@ -320,30 +336,35 @@ class ExcelConsolidator:
             raise ValueError("Data start row must be after the header row")
 
         try:
-            with open_workbook(self.consolidation_path, read_only=True) as wb:
+            with open_workbook(self.consolidation_path, **Constants.READ_WORKBOOK_OPTIONS) as wb:
                 if self.config.consolidation_sheet not in wb.sheetnames:
                     available_sheets = ", ".join(wb.sheetnames)
                     raise ValueError(f"Sheet '{self.config.consolidation_sheet}' not found. Available sheets: [{available_sheets}]")
 
-                ws = wb[self.config.consolidation_sheet]
-                
-                # Check if we have enough rows
-                if ws.max_row < header_row:
-                    raise ValueError(f"Consolidation sheet has less than {header_row} rows. Cannot find header row.")
+                ws = reset_unsized_dimensions(wb[self.config.consolidation_sheet])
                 
                 # Fetch the header from the defined header row
-                header_row_data = [cell.value for cell in ws[header_row]]
-                dest_columns = set(self.cell_map_df["Destination Column (Consolidation)"])
+                # (plain values only; no cell objects are needed for validation)
+                header_values = next(ws.iter_rows(min_row=header_row, max_row=header_row, values_only=True), None)
+                
+                # Check if we have enough rows (the sheet's rows are read rather than
+                # trusting the stored dimension, which may be missing or wrong)
+                if header_values is None:
+                    raise ValueError(f"Consolidation sheet has less than {header_row} rows. Cannot find header row.")
                 
                 # Clean and normalize header data
-                header_row_data = [str(h).strip() if h is not None else "" for h in header_row_data]
-                dest_columns = {str(d).strip() for d in dest_columns}
+                header_row_data = [str(value).strip() if value is not None else "" for value in header_values]
+                col_indices = {name: idx + 1 for idx, name in enumerate(header_row_data) if name}
 
-                missing_cols = dest_columns - set(header_row_data)
+                # Mapping plan destinations are already normalized; check each against the header once
+                missing_cols = {dest_col for _, _, dest_col in self._mapping_plan if dest_col not in col_indices}
                 if missing_cols:
                     self.logger.error(f"Header data from row {header_row}: {header_row_data}")
-                    self.logger.error(f"Required destination columns: {dest_columns}")
-                    raise ValueError(f"Missing destination columns in consolidation sheet (row {header_row}): {', '.join(sorted(list(missing_cols)))}")
+                    self.logger.error(f"Required destination columns: {sorted({dest_col for _, _, dest_col in self._mapping_plan})}")
+                    raise ValueError(f"Missing destination columns in consolidation sheet (row {header_row}): {', '.join(sorted(missing_cols))}")
+                
+                # Cache the column lookup so run_consolidation does not need to re-read the header
+                self._col_indices = col_indices
                     
         except Exception as e:
             if isinstance(e, ValueError):
@@ -364,22 +385,18 @@ class ExcelConsolidator:
         try:
             current_file_path = self._resolve_file_path(file_path, "Estimate")
             
-            with open_workbook(current_file_path, read_only=True) as wb:
-                for _, row in self.cell_map_df.iterrows():
-                    sheet_name = row["Source Sheet"]
-                    cell_ref = row["Source Cell"]
-                    
-                    if sheet_name not in wb.sheetnames:
-                        available_sheets = ", ".join(wb.sheetnames)
-                        raise ValueError(f"In file '{current_file_path.name}', required sheet '{sheet_name}' not found. Available sheets: [{available_sheets}]")
-
-                    ws = wb[sheet_name]
+            # Only the sheet names are needed, so read them straight from the
+            # workbook part instead of loading the whole workbook
+            sheet_names = FileHandler.get_sheet_names(current_file_path)
+            
+            # Cell references were checked with the Cell Map, so each file only needs
+            # one membership probe per distinct required sheet
+            available = set(sheet_names)
+            for sheet_name in self._required_sheets:
+                if sheet_name not in available:
+                    available_sheets = ", ".join(sheet_names)
+                    raise ValueError(f"In file '{current_file_path.name}', required sheet '{sheet_name}' not found. Available sheets: [{available_sheets}]")
                     
-                    try:
-                        _ = ws[cell_ref]
-                    except Exception as e:
-                        raise ValueError(f"In file '{current_file_path.name}', cell '{cell_ref}' could not be accessed in sheet '{sheet_name}'. Error: {e}")
-                        
         except ValueError:
             raise
         except Exception as e:
@@ -388,6 +405,37 @@ class ExcelConsolidator:
         self.logger.info(f"Estimate file validated: {Path(file_path).name}")
         return True
 
+    def validate_estimate_files(self, file_paths: List[str], progress_callback: Optional[Callable] = None):
+        """
+        Validates several estimate files concurrently.
+        All files are checked; failures are collected and raised as a single ValueError.
+        The progress callback is called on the calling thread (never a pool thread) as each file completes.
+        """
+        if self.cell_map_df is None:
+            raise ValueError("Cell Map must be validated first before validating estimate files")
+        if not file_paths:
+            return True
+        
+        total = len(file_paths)
+        errors = {}
+        max_workers = min(Constants.MAX_VALIDATION_WORKERS, os.cpu_count() or 1, total)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self._validate_estimate_file, file_path): idx for idx, file_path in enumerate(file_paths)}
+            for completed, future in enumerate(as_completed(futures), start=1):
+                idx = futures[future]
+                try:
+                    future.result()
+                except ValueError as e:
+                    errors[idx] = str(e)
+                if progress_callback:
+                    progress_callback("validation", completed, total, f"Validated {Path(file_paths[idx]).name}")
+        
+        if errors:
+            # Report in selection order rather than completion order
+            details = "\n".join(f"- {errors[idx]}" for idx in sorted(errors))
+            raise ValueError(f"{len(errors)} of {total} estimate file(s) failed validation:\n{details}")
+        return True
+
     def run_consolidation(self, estimate_files: List[str], progress_callback: Optional[Callable] = None):
         """
         Performs the consolidation, updating progress via the callback.
@@ -395,63 +443,78 @@ class ExcelConsolidator:
         """
         if self.cell_map_df is None:
             raise ValueError("Cell Map must be validated first before running consolidation")
+        if self._col_indices is None:
+            self._validate_consolidation_file()
             
         try:
             # Load consolidation workbook and sheet
-            cons_wb = load_workbook(self.consolidation_path)
+            # External link parts are kept: formulas already in the template may point at them
+            from openpyxl import load_workbook
+            cons_wb = load_workbook(self.consolidation_path, data_only=False)
             if self.config.consolidation_sheet not in cons_wb.sheetnames:
                 raise ValueError(f"Critical: Consolidation sheet '{self.config.consolidation_sheet}' not found in workbook '{self.consolidation_path.name}'")
             
             cons_ws = cons_wb[self.config.consolidation_sheet]
 
             # Validate row configuration
-            header_row = self._validate_row_input(self.config.header_row, "Header row")
             data_start_row = self._validate_row_input(self.config.data_start_row, "Data start row")
 
-            # Find header row and column indices
-            if cons_ws.max_row < header_row:
-                raise ValueError(f"Consolidation sheet '{self.config.consolidation_sheet}' has less than {header_row} rows. Cannot find header row for writing.")
-
-            header_values = [cell.value for cell in cons_ws[header_row]]
-            col_indices = {name: idx + 1 for idx, name in enumerate(header_values) if name is not None}
+            # Column indices were cached from the header when the consolidation file was validated
+            col_indices = self._col_indices
 
             # Clear existing data if requested
             if self.config.clear_existing_data:
-                self._clear_existing_data(cons_ws, col_indices, data_start_row, progress_callback, len(estimate_files))            # Process estimate files
-            current_data_row = data_start_row
-            item_number = 1  # Start item numbering from 1
+                self._clear_existing_data(cons_ws, col_indices, data_start_row, progress_callback, len(estimate_files))
+
+            # Resolve destination columns and the "Sheet'!Cell" formula tail once;
+            # the plan is the same for every file
+            resolved_plan = []
+            for src_sheet, src_cell, dest_col_name in self._mapping_plan:
+                if dest_col_name not in col_indices:
+                    self.logger.warning(f"Destination column '{dest_col_name}' not found in consolidation header. Skipping.")
+                    continue
+                resolved_plan.append((col_indices[dest_col_name], src_sheet + "'!" + src_cell))
+
+            # Build every output row in memory first; the worksheet is written in one pass below
+            row_width = max([2] + [dest_col_idx for dest_col_idx, _ in resolved_plan])
+            empty_row = [None] * row_width
+            rows = []
+            
             for i, est_file_path_str in enumerate(estimate_files):
                 est_file_full_path = Path(est_file_path_str).resolve()
+                # Path components are derived on every attribute access; take them once
+                parent_str, name_str, stem_str = str(est_file_full_path.parent), est_file_full_path.name, est_file_full_path.stem
+                item_number = i + 1  # Item numbering starts from 1
                 
-                # Set filename in first column (Column A)
-                cons_ws.cell(row=current_data_row, column=1, value=est_file_full_path.stem)
+                # Filename in first column (Column A), item number in second column (Column B)
+                row_values = empty_row.copy()
+                row_values[0] = stem_str
+                row_values[1] = item_number
                 
-                # Set item number in second column (Column B) 
-                cons_ws.cell(row=current_data_row, column=2, value=item_number)
+                # External reference prefix shared by every formula for this file
+                prefix = f"='{parent_str}\\[{name_str}]"
                 
-                # Process each mapping with enhanced validation
-                for _, map_row in self.cell_map_df.iterrows():
-                    src_sheet = ValidationUtils.validate_sheet_name(map_row["Source Sheet"])
-                    src_cell = str(map_row["Source Cell"]).strip()
-                    dest_col_name = str(map_row["Destination Column (Consolidation)"]).strip()
-
-                    if dest_col_name not in col_indices:
-                        self.logger.warning(f"Destination column '{dest_col_name}' not found in consolidation header. Skipping.")
-                        continue
-
-                    dest_col_idx = col_indices[dest_col_name]
-                    
-                    # Create Excel formula for linking
-                    formula = f"='{est_file_full_path.parent}\\[{est_file_full_path.name}]{src_sheet}'!{src_cell}"
-                    
-                    # Write the formula directly (no validation needed for our generated formulas)
-                    cons_ws.cell(row=current_data_row, column=dest_col_idx, value=formula)
+                for dest_col_idx, reference_tail in resolved_plan:
+                    # Create Excel formula for linking (no validation needed for our generated formulas)
+                    row_values[dest_col_idx - 1] = prefix + reference_tail
                 
-                current_data_row += 1
-                item_number += 1  # Increment item number for next row
+                rows.append(row_values)
 
                 if progress_callback:
-                    progress_callback("processing", i + 1, len(estimate_files), f"Processed {est_file_full_path.name} (Item #{item_number-1})")
+                    progress_callback("processing", i + 1, len(estimate_files), f"Processed {name_str} (Item #{item_number})")
+
+            if rows:
+                if cons_ws.max_row == data_start_row - 1:
+                    # Nothing is stored at or below the data start row: append whole rows
+                    for row_values in rows:
+                        cons_ws.append(row_values)
+                else:
+                    # Walk the target block once and fill the populated slots of each row
+                    target_rows = cons_ws.iter_rows(min_row=data_start_row, max_row=data_start_row + len(rows) - 1, max_col=row_width)
+                    for row_cells, row_values in zip(target_rows, rows):
+                        for cell, value in zip(row_cells, row_values):
+                            if value is not None:
+                                cell.value = value
 
             # Save output file
             if progress_callback:
@@ -479,28 +542,24 @@ class ExcelConsolidator:
         if progress_callback:
             progress_callback("clearing", 0, total_files, "Clearing existing data...")
         
-        # Determine columns to clear (only those that are mapped)
-        columns_to_clear_indices = [col_indices[dest_col] for dest_col in self.cell_map_df["Destination Column (Consolidation)"] if dest_col in col_indices]
+        # Determine columns to clear: filename (Column A), item number (Column B) and mapped columns
+        columns_to_clear = {1, 2}
+        columns_to_clear.update(col_indices[dest_col] for _, _, dest_col in self._mapping_plan if dest_col in col_indices)
+        offsets_to_clear = sorted(col_idx - 1 for col_idx in columns_to_clear)
         
-        # Clear data with safety limits
-        rows_cleared_consecutively_empty = 0
-        max_rows_to_scan = cons_ws.max_row
-        
-        for r_idx in range(data_start_row, max_rows_to_scan + 1):            # Check if the first cell has content
-            first_cell_val = cons_ws.cell(row=r_idx, column=1).value
-            if first_cell_val is not None and str(first_cell_val).strip() != "":
-                # Clear mapped columns and filename column
-                for col_idx_to_clear in columns_to_clear_indices:
-                    cons_ws.cell(row=r_idx, column=col_idx_to_clear, value=None)
-                # Clear filename column (Column A) and item number column (Column B)
-                cons_ws.cell(row=r_idx, column=1, value=None)
-                cons_ws.cell(row=r_idx, column=2, value=None)
-                rows_cleared_consecutively_empty = 0
-            else:
-                rows_cleared_consecutively_empty += 1
-            
-            if rows_cleared_consecutively_empty > Constants.MAX_EMPTY_ROWS_BEFORE_STOP:
+        # Walk the rows once, assigning directly to the row's cells; Cell objects are
+        # reused so formatting in the template is kept. Only the contiguous block this
+        # tool writes (a filename in column A and an integer item number in column B)
+        # is cleared; the first row that doesn't match ends it, so totals, notes and
+        # anything else below the data are left alone.
+        for row_cells in cons_ws.iter_rows(min_row=data_start_row, max_row=cons_ws.max_row, max_col=offsets_to_clear[-1] + 1):
+            first_cell_val = row_cells[0].value
+            item_number = row_cells[1].value
+            if (first_cell_val is None or str(first_cell_val).strip() == ""
+                    or not isinstance(item_number, int) or isinstance(item_number, bool)):
                 break
+            for offset in offsets_to_clear:
+                row_cells[offset].value = None
         
         if progress_callback:
             progress_callback("clearing", total_files, total_files, "Clearing complete.")
@@ -508,6 +567,10 @@ class ExcelConsolidator:
 
 # --- Graphical User Interface ---
 class ConsolidatorApp:
+    # Progress bar percentage at which each phase starts, and the share each phase covers
+    _PHASE_BASE = {"validation": 0, "clearing": 10, "processing": 20, "saving": 90}
+    _PHASE_WEIGHT = {"validation": 10, "clearing": 10, "processing": 70, "saving": 10}
+
     def __init__(self, root):
         self.root = root
         self.root.title("Auto Consolidator")
@@ -553,6 +616,10 @@ class ConsolidatorApp:
         self.clear_data_var = tk.BooleanVar(value=True) # Default to True for a clean slate
         
         self.estimate_files = []
+        self._estimate_set = set() # Mirrors estimate_files for membership checks
+        self._log_queue = queue.Queue() # Log lines from any thread, drained on the Tk main loop
+        self._last_progress_time = 0.0 # Throttle state for _post_progress (worker thread only)
+        self._last_progress_phase = None
         self.output_file_path = None # For "Open Output" feature        # --- Improvement 1: Auto-populate Cell Map Path ---
         # Attempt to find Cell Map.xlsx in the application's directory
         default_cell_map_name = Constants.CELL_MAP_FILENAME
@@ -639,7 +706,11 @@ class ConsolidatorApp:
                                                   font=tkFont.Font(family="Consolas", size=9), # Monospaced for logs
                                                   bg="#f0f0f0", fg="#333333", relief="solid", borderwidth=1)
         self.log_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        # Tag configurations for log_text would remain in _log_message
+        self.log_text.tag_config("INFO", foreground="black")
+        self.log_text.tag_config("SUCCESS", foreground="green")
+        self.log_text.tag_config("WARN", foreground="orange")
+        self.log_text.tag_config("ERROR", foreground="red")
+        self.root.after(Constants.LOG_PUMP_INTERVAL_MS, self._pump_log)
 
         action_buttons_frame = ttk.Frame(main_frame, style="TFrame")
         action_buttons_frame.grid(row=3, column=0, padx=10, pady=10, sticky="ew")
@@ -665,56 +736,75 @@ class ConsolidatorApp:
         if file: string_var.set(file)
     def _select_cell_map(self): self._select_file("Select Cell Map File", self.cell_map_path) # Unchanged
     def _select_consolidation_file(self): self._select_file("Select Consolidation File", self.consolidation_path) # Unchanged
-    def _select_estimate_files(self): # Unchanged
+    def _select_estimate_files(self):
         files = filedialog.askopenfilenames(title="Select Estimate Files", filetypes=[("Excel Files", "*.xlsx")])
         if files:
-            self.estimate_files.extend([f for f in files if f not in self.estimate_files])
+            for f in files:
+                if f not in self._estimate_set:
+                    self._estimate_set.add(f)
+                    self.estimate_files.append(f)
             self._update_listbox()
     def _update_listbox(self): # Unchanged
         self.estimate_listbox.delete(0, tk.END)
         for f in self.estimate_files: self.estimate_listbox.insert(tk.END, f)
         self._update_run_button_state()
-    def _clear_estimate_files(self): # Unchanged
+    def _clear_estimate_files(self):
         self.estimate_files = []
+        self._estimate_set.clear()
         self._update_listbox()
     def _update_run_button_state(self): # Unchanged
         if self.estimate_files: self.run_button.config(state=tk.NORMAL)
         else: self.run_button.config(state=tk.DISABLED)
 
-    def _log_message(self, msg, level="INFO"): # Unchanged
-        self.log_text.config(state="normal")
-        self.log_text.insert(tk.END, f"[{level}] {msg}\n", level)
-        self.log_text.config(state="disabled")
-        self.log_text.see(tk.END)
-        self.root.update_idletasks()
-        self.log_text.tag_config("INFO", foreground="black")
-        self.log_text.tag_config("SUCCESS", foreground="green")
-        self.log_text.tag_config("WARN", foreground="orange")
-        self.log_text.tag_config("ERROR", foreground="red")
+    def _log_message(self, msg, level="INFO"):
+        """Queue a log line; safe to call from worker threads"""
+        self._log_queue.put((level, msg))
 
-    def _progress_callback(self, phase: str, current: int, total: int, message: str):
-        """Enhanced progress tracking with phase information"""
-        phase_weights = {"validation": 0.1, "clearing": 0.1, "processing": 0.7, "saving": 0.1}
+    def _pump_log(self):
+        """Write queued log lines in one batch and redraw once, then reschedule"""
+        entries = []
+        try:
+            while len(entries) < Constants.LOG_PUMP_BATCH_SIZE:
+                entries.append(self._log_queue.get_nowait())
+        except queue.Empty:
+            pass
         
-        # Calculate base progress from completed phases
-        completed_phases = []
-        if phase in ["clearing", "processing", "saving"]:
-            completed_phases.append("validation")
-        if phase in ["processing", "saving"]:
-            completed_phases.append("clearing")
-        if phase == "saving":
-            completed_phases.append("processing")
-            
-        base_progress = sum(phase_weights.get(p, 0) for p in completed_phases) * 100
+        if entries:
+            self.log_text.config(state="normal")
+            for level, msg in entries:
+                self.log_text.insert(tk.END, f"[{level}] {msg}\n", level)
+            # Drop the oldest lines so the widget stays the same size on long runs
+            # (every line ends in a newline, so end-1c sits on an empty last line)
+            excess = int(self.log_text.index("end-1c").split(".")[0]) - 1 - Constants.MAX_LOG_LINES
+            if excess > 0:
+                self.log_text.delete("1.0", f"{excess + 1}.0")
+            self.log_text.config(state="disabled")
+            self.log_text.see(tk.END)
+            self.root.update_idletasks()
         
-        # Calculate current phase progress
-        phase_progress = 0
+        self.root.after(Constants.LOG_PUMP_INTERVAL_MS, self._pump_log)
+
+    def _post_progress(self, phase: str, current: int, total: int, message: str):
+        """Forward a worker-thread progress update to the Tk main loop, a few times per second at most"""
+        # Throttle before posting so skipped updates never reach the Tk event queue;
+        # the first update of a phase and its final one always go through
+        now = time.monotonic()
+        if (phase == self._last_progress_phase and current != total
+                and now - self._last_progress_time < Constants.PROGRESS_MIN_INTERVAL_S):
+            return
+        self._last_progress_time = now
+        self._last_progress_phase = phase
+        self.root.after(0, self._progress_callback, phase, current, total, message)
+
+    def _progress_callback(self, phase: str, current: int, total: int, message: str):
+        """Enhanced progress tracking with phase information"""
+        # Base progress from completed phases plus the share of the current phase
+        progress_value = self._PHASE_BASE.get(phase, 0)
         if total > 0:
-            phase_progress = (current / total) * phase_weights.get(phase, 0.1) * 100
+            progress_value += (current / total) * self._PHASE_WEIGHT.get(phase, 10)
             
-        self.progress['value'] = base_progress + phase_progress
+        self.progress['value'] = progress_value
         self._log_message(f"[{phase.upper()}] {message}", "INFO")
-        self.root.update_idletasks()
 
     # Backward compatibility method for simple progress updates
     def _simple_progress_callback(self, current: int, total: int, message: str):
@@ -724,33 +814,43 @@ class ConsolidatorApp:
         else:
             self.progress['value'] = 0
         self._log_message(message, "INFO")
-        self.root.update_idletasks()
 
     # --- Feature: Open Output File/Folder Methods ---
     def _open_output_file(self):
-        if self.output_file_path and Path(self.output_file_path).exists():
-            try:
-                os.startfile(self.output_file_path)
-                self._log_message(f"Opened output file: {self.output_file_path}", "INFO")
-            except Exception as e:
-                self._log_message(f"Failed to open output file: {e}", "ERROR")
-                messagebox.showerror("Error", f"Could not open file: {e}")
+        # No exists() probe; a missing file is reported when opening it fails
+        if self.output_file_path is not None:
+            self._shell_open(self.output_file_path, "file")
         else:
             self._log_message("Output file not available or does not exist.", "WARN")
             messagebox.showwarning("Not Found", "Output file is not available or no longer exists.")
 
     def _open_output_folder(self):
-        if self.output_file_path and Path(self.output_file_path).exists():
-            try:
-                os.startfile(Path(self.output_file_path).parent)
-                self._log_message(f"Opened output folder: {Path(self.output_file_path).parent}", "INFO")
-            except Exception as e:
-                self._log_message(f"Failed to open output folder: {e}", "ERROR")
-                messagebox.showerror("Error", f"Could not open folder: {e}")
+        if self.output_file_path is not None:
+            # run_consolidation returns a Path, so .parent needs no conversion
+            self._shell_open(self.output_file_path.parent, "folder")
         else:
             self._log_message("Output folder not available (no output file generated yet).", "WARN")
             messagebox.showwarning("Not Found", "Output folder is not available.")
 
+    def _shell_open(self, path, kind):
+        """Open a file or folder with its default handler without blocking the Tk loop"""
+        # os.startfile can stall while Explorer spins up, so run it off the main thread
+        def worker():
+            try:
+                os.startfile(path)
+                self._log_message(f"Opened output {kind}: {path}", "INFO")
+            except FileNotFoundError:
+                self._log_message(f"Output {kind} no longer exists: {path}", "WARN")
+                self.root.after(0, messagebox.showwarning, "Not Found", f"Output {kind} is not available or no longer exists.")
+            except Exception as e:
+                self._log_message(f"Failed to open output {kind}: {e}", "ERROR")
+                self.root.after(0, messagebox.showerror, "Error", f"Could not open {kind}: {e}")
+
+        try:
+            threading.Thread(target=worker, daemon=True).start()
+        except RuntimeError:
+            worker() # Could not start a thread; open synchronously as before
+
 
     def _start_consolidation_thread(self):
         if not self.cell_map_path.get() or not self.consolidation_path.get():
@@ -820,37 +920,40 @@ class ConsolidatorApp:
                 raise ValueError("No estimate files selected.")
             
             self._log_message(f"Validating {len(self.estimate_files)} estimate file(s)...", "INFO")
-            for f_idx, f_path in enumerate(self.estimate_files):
-                self._log_message(f"Validating estimate file {f_idx+1}: {Path(f_path).name}", "INFO")
-                consolidator._validate_estimate_file(f_path)
+            # Progress is reported on this worker thread; _post_progress hands it to the Tk main loop
+            consolidator.validate_estimate_files(self.estimate_files, self._post_progress)
             self._log_message("All estimate files validated.", "SUCCESS")
 
-            self.progress["value"] = 0
+            self.root.after(0, self.progress.config, {"value": 0})
             self._log_message("Starting consolidation process...", "INFO")
             
-            output_file = consolidator.run_consolidation(self.estimate_files, self._progress_callback)
+            output_file = consolidator.run_consolidation(self.estimate_files, self._post_progress)
             
             self.output_file_path = output_file
             success_msg = f"Consolidation complete! Output saved as: {self.output_file_path}"
             self._log_message(success_msg, "SUCCESS")
-            messagebox.showinfo("Success", success_msg)
-            # Enable open buttons on success
-            self.open_output_button.config(state=tk.NORMAL)
-            self.open_folder_button.config(state=tk.NORMAL)
+            # This runs on the worker thread; dialogs and widget changes go through the Tk main loop
+            self.root.after(0, self._on_consolidation_success, success_msg)
 
         except ValueError as ve:
             logging.error(f"Validation or Logic Error: {str(ve)}", exc_info=False)
             self._log_message(f"Error: {str(ve)}", "ERROR")
-            messagebox.showerror("Error", str(ve))
+            self.root.after(0, messagebox.showerror, "Error", str(ve))
         except Exception as e:
             critical_error_msg = f"A critical error occurred: {type(e).__name__} - {str(e)}"
             logging.error(critical_error_msg, exc_info=True)
             self._log_message(critical_error_msg, "ERROR")
-            messagebox.showerror("Critical Error", critical_error_msg)
+            self.root.after(0, messagebox.showerror, "Critical Error", critical_error_msg)
         finally:
             # Re-enable run button regardless of outcome
             self.root.after(0, lambda: self.run_button.config(state=tk.NORMAL if self.estimate_files else tk.DISABLED))
 
+    def _on_consolidation_success(self, success_msg):
+        # Enable open buttons on success
+        self.open_output_button.config(state=tk.NORMAL)
+        self.open_folder_button.config(state=tk.NORMAL)
+        messagebox.showinfo("Success", success_msg)
+
 
 # --- Utility Classes ---
 class FileHandler:
@@ -898,10 +1001,105 @@ class FileHandler:
         except Exception:
             return True  # If we can't check size, assume it's okay
 
+    @staticmethod
+    def get_sheet_names(file_path: Path) -> List[str]:
+        """
+        Read worksheet names from an .xlsx/.xlsm package without loading the workbook.
+        Only the workbook part is parsed; styles, shared strings and sheets are skipped.
+        """
+        with zipfile.ZipFile(file_path) as archive:
+            workbook_part = "xl/workbook.xml"
+            if workbook_part not in archive.namelist():
+                # Non-standard layout: locate the workbook part via the package relationships
+                rels = ET.fromstring(archive.read("_rels/.rels"))
+                targets = [rel.get("Target", "") for rel in rels if rel.get("Type", "").endswith("/officeDocument")]
+                if not targets:
+                    raise ValueError("Workbook part not found in file")
+                workbook_part = targets[0].lstrip("/")
+            root = ET.fromstring(archive.read(workbook_part))
+        
+        # Match on the local tag name so both transitional and strict namespaces work
+        return [el.get("name") for el in root.iter() if el.tag.rsplit("}", 1)[-1] == "sheet"]
+
+class CellMapCache:
+    """
+    On-disk cache of validated Cell Map columns, keyed by file path, mtime and size.
+    Stored as JSON so a cache file can never execute code when loaded.
+    Any cache problem is ignored and the Cell Map is simply parsed again.
+    """
+    
+    @staticmethod
+    def _cache_dir() -> Path:
+        return Path.home() / ".cache" / Constants.CACHE_DIR_NAME
+    
+    @staticmethod
+    def _path_prefix(file_path: Path) -> str:
+        return "cellmap-" + hashlib.sha1(str(file_path).encode("utf-8")).hexdigest()[:16]
+    
+    @staticmethod
+    def _cache_file(file_path: Path) -> Path:
+        stat = file_path.stat()
+        # The version sits after the path prefix so store() also sweeps entries from older versions
+        key = f"{CellMapCache._path_prefix(file_path)}-v{Constants.CELL_MAP_CACHE_VERSION}-{stat.st_mtime_ns}-{stat.st_size}"
+        return CellMapCache._cache_dir() / f"{key}.json"
+    
+    @staticmethod
+    def load(file_path: Path, required_columns: List[str]):
+        """Return (columns, column_lists) for an unchanged Cell Map, or None"""
+        try:
+            with open(CellMapCache._cache_file(file_path), "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            columns, column_lists = cached["columns"], cached["data"]
+            if (not isinstance(columns, list) or not isinstance(column_lists, list)
+                    or len(columns) != len(column_lists)
+                    or any(col not in columns for col in required_columns)
+                    or len({len(values) for values in column_lists}) > 1):
+                return None
+            return columns, column_lists
+        except (OSError, RuntimeError, ValueError, KeyError, TypeError):
+            # RuntimeError: Path.home() could not determine a home directory
+            return None
+    
+    @staticmethod
+    def store(file_path: Path, columns: List[str], column_lists: List[list]):
+        """Write validated Cell Map columns to the cache and drop stale entries for the same file"""
+        try:
+            cache_file = CellMapCache._cache_file(file_path)
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            for stale in cache_file.parent.glob(f"{CellMapCache._path_prefix(file_path)}-*.json"):
+                if stale != cache_file:
+                    stale.unlink()
+            cache_file.write_text(json.dumps({"columns": columns, "data": column_lists}), encoding="utf-8")
+        except (OSError, RuntimeError, TypeError, ValueError):
+            # Values JSON cannot represent (e.g. dates), no home directory or an unwritable cache dir: skip caching
+            pass
+
 # Enhanced validation utilities
 class ValidationUtils:
     """Utility methods for input validation"""
     
+    _INJECTION_PATTERN = re.compile(r"^\s*[=+\-@]")
+    _CELL_REF_PATTERN = re.compile(r"^\$?([A-Z]{1,3})\$?([1-9][0-9]*)$", re.IGNORECASE)
+    MAX_EXCEL_COLUMN = 16384  # XFD
+    MAX_EXCEL_ROW = 1048576
+    _INVALID_SHEET_CHARS = '\\/*[]:?'
+    _STRIP_INVALID_SHEET_CHARS = str.maketrans('', '', _INVALID_SHEET_CHARS)
+    
+    @staticmethod
+    def validate_cell_reference(cell_ref: str) -> str:
+        """Validate a single A1-style cell reference (e.g. "C5" or "$C$5")"""
+        match = ValidationUtils._CELL_REF_PATTERN.match(str(cell_ref).strip())
+        if not match:
+            raise ValueError(f"Invalid cell reference '{cell_ref}'")
+        
+        from openpyxl.utils import column_index_from_string
+        
+        column_letters, row = match.groups()
+        if column_index_from_string(column_letters.upper()) > ValidationUtils.MAX_EXCEL_COLUMN or int(row) > ValidationUtils.MAX_EXCEL_ROW:
+            raise ValueError(f"Cell reference '{cell_ref}' is outside the worksheet bounds")
+            
+        return cell_ref
+    
     @staticmethod
     def validate_excel_formula_injection(value: str, allow_formulas: bool = False) -> str:
         """Basic protection against Excel formula injection
@@ -910,17 +1108,15 @@ class ValidationUtils:
             value: The value to validate
             allow_formulas: If True, allows legitimate Excel formulas starting with =
         """
-        if not isinstance(value, str):
-            return value
-            
-        # If formulas are allowed, don't sanitize legitimate Excel formulas
-        if allow_formulas:
+        # Non-strings and legitimate Excel formulas (when allowed) pass through unchanged
+        if allow_formulas or not isinstance(value, str):
             return value
             
         # For user input data, sanitize potential formula injection
-        if value.strip().startswith(('=', '+', '-', '@')):
+        # (the regex skips leading whitespace without copying the string)
+        if ValidationUtils._INJECTION_PATTERN.match(value):
             # Log potential injection attempt
-            logging.warning(f"Potential formula injection detected in user data: {value[:50]}")
+            logging.debug(f"Potential formula injection detected in user data: {value[:50]}")
             # Sanitize by prefixing with single quote
             return "'" + value
         return value
@@ -931,11 +1127,11 @@ class ValidationUtils:
         if not sheet_name or not sheet_name.strip():
             raise ValueError("Sheet name cannot be empty")
             
-        # Excel sheet name restrictions
-        invalid_chars = ['\\', '/', '*', '[', ']', ':', '?']
-        for char in invalid_chars:
-            if char in sheet_name:
-                raise ValueError(f"Sheet name contains invalid character '{char}'")
+        # Excel sheet name restrictions; one translate pass, then find the culprit only on failure
+        if len(sheet_name.translate(ValidationUtils._STRIP_INVALID_SHEET_CHARS)) != len(sheet_name):
+            for char in ValidationUtils._INVALID_SHEET_CHARS:
+                if char in sheet_name:
+                    raise ValueError(f"Sheet name contains invalid character '{char}'")
                 
         if len(sheet_name) > 31:
             raise ValueError("Sheet name cannot exceed 31 characters")
@@ -960,24 +1156,29 @@ class MemoryOptimizer:
 
 # Performance monitoring decorator
 def monitor_performance(func):
-    """Decorator to monitor function performance"""
+    """Decorator to monitor function performance (set AC_PROFILE=1 to enable)"""
+    # Optimized builds (python -O / PyInstaller optimize=2) and normal runs get the bare function
+    if not __debug__ or not os.environ.get("AC_PROFILE"):
+        return func
+    
     def wrapper(*args, **kwargs):
-        import time
-        start_time = time.time()
+        start_time = time.perf_counter()
         try:
             result = func(*args, **kwargs)
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
             if hasattr(args[0], 'logger'):
                 args[0].logger.info(f"{func.__name__} completed in {duration:.2f} seconds")
             return result
         except Exception as e:
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
             if hasattr(args[0], 'logger'):
                 args[0].logger.error(f"{func.__name__} failed after {duration:.2f} seconds: {e}")
             raise
     return wrapper
 
 if __name__ == "__main__":
+    from ttkthemes import ThemedTk
+    
     root = ThemedTk(theme="arc")
     app = ConsolidatorApp(root)
     root.mainloop()
\ No newline at end of file
@@ -26,25 +26,25 @@ if exist "auto_consolidator.ico" (
 ) else (
     echo No icon file found. Building without custom icon...
     echo See icon_instructions.txt for how to add a custom icon.
-    pyinstaller --onefile --windowed --name "Auto_Consolidator" auto_consolidator.py
+    pyinstaller --onedir --windowed --optimize 2 --exclude-module pandas --exclude-module numpy --exclude-module scipy --exclude-module sqlalchemy --exclude-module matplotlib --exclude-module IPython --exclude-module tkinter.test --exclude-module test --exclude-module unittest --exclude-module pydoc --exclude-module doctest --name "Auto_Consolidator" auto_consolidator.py
 )
 
-if exist "dist\Auto_Consolidator.exe" (
+if exist "dist\Auto_Consolidator\Auto_Consolidator.exe" (
     echo.
     echo ========================================
     echo Build completed successfully!
-    echo Executable location: dist\Auto_Consolidator.exe
+    echo Executable location: dist\Auto_Consolidator\Auto_Consolidator.exe
     echo ========================================
     echo.
     
     REM Copy Cell Map template to dist folder
     if exist "Cell Map.xlsx" (
-        copy "Cell Map.xlsx" "dist\"
-        echo Cell Map template copied to dist folder.
+        copy "Cell Map.xlsx" "dist\Auto_Consolidator\"
+        echo Cell Map template copied to dist\Auto_Consolidator folder.
     )
     
     echo Opening dist folder...
-    start "" "dist"
+    start "" "dist\Auto_Consolidator"
 ) else (
     echo.
     echo ========================================